@@ -19,4 +19,5 @@ ON CONFLICT DO NOTHING;
 
 -- Создание индексов для оптимизации
 CREATE INDEX IF NOT EXISTS idx_fridge_items_name ON fridge_items(name);
-CREATE INDEX IF NOT EXISTS idx_fridge_items_status ON fridge_items(is_in_fridge);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_fridge_items_status ON fridge_items(is_in_fridge);
+CREATE INDEX IF NOT EXISTS fridge_items_created_at_desc ON fridge_items(created_at DESC);
\ No newline at end of file
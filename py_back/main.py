@@ -1,30 +1,44 @@
-from contextlib import closing
+from collections import defaultdict
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import (
+    List,
+    Dict,
+    Any,
+    Optional,
+    Callable,
+    Awaitable,
+    Tuple,
+    AsyncIterator,
+    Union,
+    DefaultDict,
+)
 
+import asyncio
+import hashlib
+import logging
 import os
 import sys
-import time
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from fastapi import FastAPI, HTTPException
+import asyncpg
+from asyncpg.pool import PoolConnectionProxy
+import orjson
+from cachetools import TTLCache
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.exception_handlers import (
+    http_exception_handler as default_http_exception_handler,
+)
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 import uvicorn
 
-app = FastAPI(title="Database Python API", version="1.0.0")
-
 RESOURCE = "api"
 
-# CORS. В бою лучше явно указать допустимые домены.
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Подробные сообщения по запросам пишутся на уровне DEBUG: в проде
+# (LOG_LEVEL=WARNING по умолчанию) они не тратят время на вывод.
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING").upper())
+logger = logging.getLogger(__name__)
 
 
 class ItemCreate(BaseModel):
@@ -45,37 +59,47 @@ class SearchRequest(BaseModel):
 
 
 DB_CONFIG = {
-    "dbname": os.getenv("DB_NAME", "fridge_db"),
+    "database": os.getenv("DB_NAME", "fridge_db"),
     "user": os.getenv("DB_USER", "fridge_user"),
     "password": os.getenv("DB_PASSWORD", "1234"),
-    "host": os.getenv("DB_HOST", "postgres"),
-    "port": os.getenv("DB_PORT", "5432"),
+    "host": os.getenv("DB_HOST", "pgbouncer"),
+    "port": int(os.getenv("DB_PORT", "6432")),
 }
 
+# Пул создаётся в каждом воркере uvicorn: к PgBouncer уходит до
+# WEB_CONCURRENCY * DB_POOL_MAX_SIZE клиентских соединений, а до Postgres
+# доходит не больше DEFAULT_POOL_SIZE из docker-compose.
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "5"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "20"))
+
+# По умолчанию один воркер и при запуске через Dockerfile, и при
+# `python main.py`; больше воркеров включается явно (docker-compose: 4).
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
 
-def get_db_connection(
-    max_retries: int = 5, delay: int = 5
-) -> psycopg2.extensions.connection:
-    """Подключение к базе данных с повторами."""
+async def create_db_pool(max_retries: int = 5, delay: int = 5) -> asyncpg.Pool:
+    """Создание пула соединений с БД с повторами."""
     print(
-        f"Подключение к БД: host={DB_CONFIG['host']}, db={DB_CONFIG['dbname']}, user={DB_CONFIG['user']}"
+        f"Подключение к БД: host={DB_CONFIG['host']}, db={DB_CONFIG['database']}, user={DB_CONFIG['user']}"
     )
 
     for attempt in range(max_retries):
         try:
-            conn = psycopg2.connect(
-                dbname=DB_CONFIG["dbname"],
-                user=DB_CONFIG["user"],
-                password=DB_CONFIG["password"],
-                host=DB_CONFIG["host"],
-                port=DB_CONFIG["port"],
+            pool = await asyncpg.create_pool(
+                **DB_CONFIG,
+                min_size=DB_POOL_MIN_SIZE,
+                max_size=DB_POOL_MAX_SIZE,
+                command_timeout=10,
+                # PgBouncer в режиме transaction не сохраняет
+                # prepared statements между транзакциями.
+                statement_cache_size=0,
             )
-            print(f"Подключение к БД успешно (попытка {attempt + 1}/{max_retries})")
-            return conn
-        except psycopg2.OperationalError as e:
+            print(f"Пул соединений создан (попытка {attempt + 1}/{max_retries})")
+            return pool
+        except (OSError, asyncpg.PostgresError) as e:
             if attempt < max_retries - 1:
                 print(f"Ошибка подключения к БД: {e}. Повтор через {delay} секунд.")
-                time.sleep(delay)
+                await asyncio.sleep(delay)
             else:
                 print(
                     f"Не удалось подключиться к базе данных после {max_retries} попыток: {e}"
@@ -88,6 +112,42 @@ def get_db_connection(
     raise ConnectionError("Не удалось установить соединение с базой данных")
 
 
+_pool_lock = asyncio.Lock()
+
+
+async def ensure_db_pool(app: FastAPI, max_retries: int = 1) -> asyncpg.Pool:
+    """Пул соединений приложения.
+
+    Если при старте БД была недоступна, пул (и схема) создаются при
+    следующем обращении, а ошибка подключения уходит в ответ запроса.
+    """
+    pool: Optional[asyncpg.Pool] = getattr(app.state, "pool", None)
+    if pool is not None:
+        return pool
+
+    async with _pool_lock:
+        pool = getattr(app.state, "pool", None)
+        if pool is None:
+            pool = await create_db_pool(max_retries=max_retries)
+            try:
+                async with pool.acquire() as conn:
+                    await init_db_schema(conn)
+            except Exception:
+                await pool.close()
+                raise
+            app.state.pool = pool
+            print("Инициализация БД завершена")
+    return pool
+
+
+@asynccontextmanager
+async def acquire_connection(request: Request) -> AsyncIterator[PoolConnectionProxy]:
+    """Соединение из пула приложения."""
+    pool = await ensure_db_pool(request.app)
+    async with pool.acquire() as conn:
+        yield conn
+
+
 PRODUCT_CATEGORIES: Dict[str, List[str]] = {
     "молочные": ["молоко", "сыр", "йогурт", "кефир", "творог", "сметана", "масло", "сливки"],
     "овощи": ["помидор", "огурец", "картофель", "морковь", "лук", "капуста", "перец"],
@@ -99,164 +159,379 @@ PRODUCT_CATEGORIES: Dict[str, List[str]] = {
 }
 
 
-def categorize_product(product_name: str) -> str:
-    """Простейшая категоризация по названию."""
-    if not product_name:
-        return "другое"
+# Статичный ответ /categories: собирается один раз при загрузке модуля.
+CATEGORIES_PAYLOAD: Dict[str, Any] = {
+    "categories": list(PRODUCT_CATEGORIES),
+    "total_categories": len(PRODUCT_CATEGORIES),
+    "category_examples": {
+        cat: keywords[:3] for cat, keywords in PRODUCT_CATEGORIES.items()
+    },
+}
 
-    product_lower = product_name.lower()
-    for category, keywords in PRODUCT_CATEGORIES.items():
-        if any(keyword in product_lower for keyword in keywords):
-            return category
-    return "другое"
+# Кэш ответов читающих эндпоинтов, локальный для процесса. Воркер, через
+# который прошла запись, очищает свой кэш сразу; остальные воркеры и записи
+# из Node-бэкенда становятся видны не позже чем через RESPONSE_CACHE_TTL
+# секунд. Фронтенд после записи обновляет список сам и не перечитывает его.
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "10"))
 
+_response_cache: TTLCache = TTLCache(maxsize=128, ttl=RESPONSE_CACHE_TTL)
+# Отдельная блокировка на каждый эндпоинт: промах по /statistics не
+# задерживает попадания в кэш /database-items.
+_response_cache_locks: DefaultDict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
 
-@app.on_event("startup")
-async def startup_event():
-    """Инициализация приложения и проверка схемы БД."""
+# Максимум товаров в одном запросе bulk-add: ограничивает размер тела,
+# массивов для unnest и время удержания соединения из пула.
+MAX_BULK_ITEMS = 500
 
-    print("Запуск Python Database API")
-    print(f"Время запуска: {datetime.now().isoformat()}")
-    print("Параметры БД:")
-    print(f"  Хост: {DB_CONFIG['host']}")
-    print(f"  База: {DB_CONFIG['dbname']}")
-    print(f"  Пользователь: {DB_CONFIG['user']}")
 
+async def cached(key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+    """Значение из кэша либо результат load(); попадание не ходит в БД."""
+    value = _response_cache.get(key)
+    if value is not None:
+        return value
 
-    try:
-        conn = get_db_connection(max_retries=3)
+    # Одновременные промахи по одному ключу ждут единственную загрузку.
+    async with _response_cache_locks[key]:
+        value = _response_cache.get(key)
+        if value is not None:
+            return value
+
+        value = await load()
+        _response_cache[key] = value
+        return value
+
+
+def invalidate_cache() -> None:
+    """Сбросить кэш ответов этого воркера после записи."""
+    _response_cache.clear()
+
+
+# Колонки товара с категорией, вычисленной SQL-функцией categorize().
+ITEM_COLUMNS = "id, name, is_in_fridge, created_at, categorize(name) AS category"
 
-        with closing(conn.cursor()) as cursor:
-            cursor.execute(
+
+async def init_db_schema(
+    conn: Union[asyncpg.Connection, PoolConnectionProxy]
+) -> None:
+    """Создание таблиц и SQL-функции категоризации, если их нет."""
+    async with conn.transaction():
+        # Несколько воркеров могут стартовать одновременно.
+        await conn.execute("SELECT pg_advisory_xact_lock(hashtext('fridge_schema'))")
+
+        table_exists = await conn.fetchval(
+            """
+            SELECT EXISTS (
+                SELECT FROM information_schema.tables
+                WHERE table_name = 'fridge_items'
+            );
+        """
+        )
+
+        if not table_exists:
+            print("Таблица fridge_items не найдена. Создаём.")
+            await conn.execute(
                 """
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables
-                    WHERE table_name = 'fridge_items'
+                CREATE TABLE fridge_items (
+                    id SERIAL PRIMARY KEY,
+                    name VARCHAR(255) NOT NULL,
+                    is_in_fridge BOOLEAN DEFAULT true,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 );
             """
             )
-            result = cursor.fetchone()
-            table_exists = result[0] if result else False
-
-            if not table_exists:
-                print("Таблица fridge_items не найдена. Создаём.")
-                cursor.execute(
-                    """
-                    CREATE TABLE fridge_items (
-                        id SERIAL PRIMARY KEY,
-                        name VARCHAR(255) NOT NULL,
-                        is_in_fridge BOOLEAN DEFAULT true,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    );
-                """
-                )
-                conn.commit()
-                print("Таблица fridge_items создана")
+            print("Таблица fridge_items создана")
 
-        conn.close()
-        print("Инициализация БД завершена")
+        # Триграммный индекс для поиска по подстроке в названии
+        # (search_products и filter_by_category: LIKE по запросу и по
+        # ключевым словам категории).
+        await conn.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        await conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS fridge_items_lower_name_trgm
+            ON fridge_items USING gin (lower(name) gin_trgm_ops);
+        """
+        )
+
+        # Все списки сортируются по created_at DESC.
+        await conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS fridge_items_created_at_desc
+            ON fridge_items (created_at DESC);
+        """
+        )
+
+        # Справочник ключевых слов: категоризация выполняется на стороне БД.
+        # priority сохраняет порядок PRODUCT_CATEGORIES: при нескольких
+        # совпадениях побеждает категория, идущая в словаре раньше.
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS product_keywords (
+                keyword TEXT PRIMARY KEY,
+                category TEXT NOT NULL,
+                priority INTEGER NOT NULL
+            );
+        """
+        )
+        keyword_rows = [
+            (keyword, category, priority)
+            for priority, (category, keywords) in enumerate(PRODUCT_CATEGORIES.items())
+            for keyword in keywords
+        ]
+        # Справочник должен точно совпадать с PRODUCT_CATEGORIES: убранные
+        # из словаря слова удаляем, иначе categorize() продолжит по ним
+        # относить товары к категориям.
+        await conn.execute(
+            "DELETE FROM product_keywords WHERE keyword <> ALL($1::text[])",
+            [keyword for keyword, _, _ in keyword_rows],
+        )
+        await conn.executemany(
+            """
+            INSERT INTO product_keywords (keyword, category, priority)
+            VALUES ($1, $2, $3)
+            ON CONFLICT (keyword) DO UPDATE
+            SET category = EXCLUDED.category, priority = EXCLUDED.priority
+        """,
+            keyword_rows,
+        )
+        await conn.execute(
+            """
+            CREATE OR REPLACE FUNCTION categorize(product_name TEXT)
+            RETURNS TEXT
+            LANGUAGE sql STABLE
+            AS $$
+                SELECT coalesce(
+                    (
+                        SELECT category FROM product_keywords
+                        WHERE position(keyword IN lower(product_name)) > 0
+                        ORDER BY priority
+                        LIMIT 1
+                    ),
+                    'другое'
+                );
+            $$;
+        """
+        )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Инициализация пула соединений и проверка схемы БД."""
+
+    print("Запуск Python Database API")
+    print(f"Время запуска: {datetime.now().isoformat()}")
+    print("Параметры БД:")
+    print(f"  Хост: {DB_CONFIG['host']}")
+    print(f"  База: {DB_CONFIG['database']}")
+    print(f"  Пользователь: {DB_CONFIG['user']}")
+
+    app.state.pool = None
+    try:
+        await ensure_db_pool(app, max_retries=3)
     except Exception as e:
         print(f"Предупреждение при инициализации БД: {e}")
-        print("Приложение продолжит работу, но доступ к БД может быть ограничен.")
+        print("Пул соединений будет создан при первом запросе к БД.")
+
+    yield
+
+    pool: Optional[asyncpg.Pool] = app.state.pool
+    if pool is not None:
+        await pool.close()
+        print("Пул соединений с БД закрыт")
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Записи asyncpg превращаются в словари только при сериализации."""
+    if isinstance(obj, asyncpg.Record):
+        return dict(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def render_json(content: Any) -> bytes:
+    """Сериализация ответа через orjson с поддержкой asyncpg.Record."""
+    return orjson.dumps(
+        content,
+        default=_orjson_default,
+        option=orjson.OPT_NON_STR_KEYS,
+    )
+
+
+class RecordJSONResponse(ORJSONResponse):
+    """ORJSONResponse, умеющий сериализовать asyncpg.Record напрямую."""
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
+
+
+def make_etag(body: bytes) -> str:
+    """Сильный ETag по содержимому ответа."""
+    return '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Совпадает ли ETag с заголовком If-None-Match клиента.
+
+    Для If-None-Match сравнение слабое: префикс W/ не учитывается.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") in (opaque, "*") for tag in header.split(",")
+    )
+
+
+# Слабый ETag: тело /categories содержит timestamp и каждый раз отличается,
+# а валидатор описывает только неизменную часть ответа.
+CATEGORIES_ETAG = "W/" + make_etag(render_json(CATEGORIES_PAYLOAD))
+
+
+# Класс по умолчанию задаёт тип ответа в документации. Обработчики всё
+# равно возвращают RecordJSONResponse явно: словарь, возвращённый как есть,
+# FastAPI сначала прогоняет через jsonable_encoder.
+app = FastAPI(
+    title="Database Python API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=RecordJSONResponse,
+)
+
+# CORS. В бою лучше явно указать допустимые домены.
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
+@app.exception_handler(HTTPException)
+async def http_exception_handler(request: Request, exc: HTTPException):
+    """Ошибки тоже отдаём через orjson: в detail передаётся datetime как есть.
+
+    Статусы без тела (1xx, 204, 304) отдаёт стандартный обработчик FastAPI.
+    """
+    if exc.status_code < 200 or exc.status_code in (204, 304):
+        return await default_http_exception_handler(request, exc)
+    return ORJSONResponse(
+        {"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers
+    )
+
+
+# Статичная часть ответа корневого эндпоинта.
+ROOT_PAYLOAD: Dict[str, Any] = {
+    "message": "Python Database API запущен",
+    "service": "python-backend",
+    "version": "1.0.0",
+    "database_config": {
+        "host": DB_CONFIG["host"],
+        "database": DB_CONFIG["database"],
+        "connected": True,
+    },
+    "endpoints": [
+        {"path": "/", "method": "GET", "description": "Информация о сервисе"},
+        {"path": "/health", "method": "GET", "description": "Проверка здоровья"},
+        {
+            "path": f"/{RESOURCE}/database-items",
+            "method": "GET",
+            "description": "Получить все товары",
+        },
+        {
+            "path": f"/{RESOURCE}/items/add",
+            "method": "POST",
+            "description": "Добавить товар",
+        },
+        {
+            "path": f"/{RESOURCE}/items/bulk-add",
+            "method": "POST",
+            "description": f"Добавить несколько товаров (до {MAX_BULK_ITEMS} за запрос)",
+        },
+        {
+            "path": f"/{RESOURCE}/categories",
+            "method": "GET",
+            "description": "Категории товаров",
+        },
+        {
+            "path": f"/{RESOURCE}/statistics",
+            "method": "GET",
+            "description": "Статистика по категориям",
+        },
+    ],
+}
 
 
 @app.get("/")
 async def root():
-    return {
-        "message": "Python Database API запущен",
-        "service": "python-backend",
-        "version": "1.0.0",
-        "timestamp": datetime.now().isoformat(),
-        "database_config": {
-            "host": DB_CONFIG["host"],
-            "database": DB_CONFIG["dbname"],
-            "connected": True,
-        },
-        "endpoints": [
-            {"path": "/", "method": "GET", "description": "Информация о сервисе"},
-            {"path": "/health", "method": "GET", "description": "Проверка здоровья"},
-            {
-                "path": f"/{RESOURCE}/database-items",
-                "method": "GET",
-                "description": "Получить все товары",
-            },
-            {
-                "path": f"/{RESOURCE}/items/add",
-                "method": "POST",
-                "description": "Добавить товар",
-            },
-            {
-                "path": f"/{RESOURCE}/categories",
-                "method": "GET",
-                "description": "Категории товаров",
-            },
-            {
-                "path": f"/{RESOURCE}/statistics",
-                "method": "GET",
-                "description": "Статистика по категориям",
-            },
-        ],
-    }
+    return RecordJSONResponse({**ROOT_PAYLOAD, "timestamp": datetime.now()})
 
 
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """Простая проверка доступности API и БД."""
     try:
-        conn = get_db_connection(max_retries=1)
-
-        with closing(conn.cursor()) as cursor:
-            cursor.execute("SELECT NOW() as db_time, version() as db_version")
-            result = cursor.fetchone()
+        async with acquire_connection(request) as conn:
+            result = await conn.fetchrow(
+                "SELECT NOW() as db_time, version() as db_version"
+            )
             db_time, db_version = result if result else (None, None)
 
-        conn.close()
-
-        return {
-            "status": "healthy",
-            "service": "python-api",
-            "timestamp": datetime.now().isoformat(),
-            "database": {
-                "status": "connected",
-                "time": db_time.isoformat() if hasattr(db_time, "isoformat") else str(db_time), # pyright: ignore[reportOptionalMemberAccess]
-                "version": db_version.split(",")[0] if db_version else "unknown",
-            },
-            "memory_usage": f"{sys.getsizeof([]) / 1024:.2f} KB",
-        }
+        return RecordJSONResponse(
+            {
+                "status": "healthy",
+                "service": "python-api",
+                "timestamp": datetime.now(),
+                "database": {
+                    "status": "connected",
+                    "time": db_time,
+                    "version": db_version.split(",")[0] if db_version else "unknown",
+                },
+                "memory_usage": f"{sys.getsizeof([]) / 1024:.2f} KB",
+            }
+        )
     except Exception as e:
-        return {
-            "status": "unhealthy",
-            "service": "python-api",
-            "timestamp": datetime.now().isoformat(),
-            "database": {
-                "status": "disconnected",
-                "error": str(e),
-            },
-            "message": "API работает, но база данных недоступна",
-        }
+        return RecordJSONResponse(
+            {
+                "status": "unhealthy",
+                "service": "python-api",
+                "timestamp": datetime.now(),
+                "database": {
+                    "status": "disconnected",
+                    "error": str(e),
+                },
+                "message": "API работает, но база данных недоступна",
+            }
+        )
 
 
-@app.get(f"/{RESOURCE}/database-items", response_model=List[ItemResponse])
-async def get_database_items():
+# Строки приходят из БД уже типизированными: ответ отдаём напрямую, без
+# повторной валидации через Pydantic. Схема остаётся в документации.
+@app.get(
+    f"/{RESOURCE}/database-items",
+    responses={200: {"model": List[ItemResponse]}},
+)
+async def get_database_items(request: Request):
     """Список товаров с вычисленными категориями."""
-    try:
-        conn = get_db_connection()
 
-        with closing(conn.cursor(cursor_factory=RealDictCursor)) as cursor:
-            cursor.execute("SELECT * FROM fridge_items ORDER BY created_at DESC")
-            items = cursor.fetchall() or []
+    async def load_items() -> Tuple[bytes, str]:
+        async with acquire_connection(request) as conn:
+            items = await conn.fetch(
+                f"SELECT {ITEM_COLUMNS} FROM fridge_items ORDER BY created_at DESC"
+            )
+        logger.debug("Получено %d записей из БД", len(items))
 
-        conn.close()
+        # В кэше лежит уже сериализованное тело: попадание не требует
+        # ни запроса к БД, ни повторной сериализации.
+        body = render_json(items)
+        return body, make_etag(body)
 
-        processed_items = []
-        for item in items:
-            if item and "name" in item:
-                processed = dict(item)
-                processed["category"] = categorize_product(item["name"])
-                processed_items.append(processed)
+    try:
+        body, etag = await cached("database-items", load_items)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
 
-        print(f"Получено {len(processed_items)} записей из БД")
-        return processed_items
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
 
     except Exception as e:
         print(f"Ошибка при получении списка товаров: {e}")
@@ -265,13 +540,13 @@ async def get_database_items():
             detail={
                 "error": "Database error",
                 "message": str(e),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": datetime.now(),
             },
         )
 
 
 @app.post(f"/{RESOURCE}/items/add")
-async def add_item(item_data: ItemCreate):
+async def add_item(item_data: ItemCreate, request: Request):
     """Создать новый товар."""
     try:
         name = item_data.name.strip()
@@ -286,39 +561,33 @@ async def add_item(item_data: ItemCreate):
                 },
             )
 
-        conn = get_db_connection()
-
-        try:
-            with closing(conn.cursor(cursor_factory=RealDictCursor)) as cursor:
-                cursor.execute(
-                    "INSERT INTO fridge_items (name, is_in_fridge) "
-                    "VALUES (%s, %s) RETURNING *",
-                    (name, is_in_fridge),
-                )
-                new_item = cursor.fetchone()
-                conn.commit()
-
-            if not new_item:
-                raise HTTPException(
-                    status_code=500,
-                    detail={
-                        "error": "Database error",
-                        "message": "Не удалось создать запись",
-                    },
-                )
+        async with acquire_connection(request) as conn:
+            new_item = await conn.fetchrow(
+                "INSERT INTO fridge_items (name, is_in_fridge) "
+                f"VALUES ($1, $2) RETURNING {ITEM_COLUMNS}",
+                name,
+                is_in_fridge,
+            )
 
-            response_item = dict(new_item)
-            response_item["category"] = categorize_product(name)
+        if not new_item:
+            raise HTTPException(
+                status_code=500,
+                detail={
+                    "error": "Database error",
+                    "message": "Не удалось создать запись",
+                },
+            )
 
-            print(f"Добавлен товар: {name} (is_in_fridge={is_in_fridge})")
+        invalidate_cache()
+        logger.debug("Добавлен товар: %s (is_in_fridge=%s)", name, is_in_fridge)
 
-            return {
+        return RecordJSONResponse(
+            {
                 "message": "Товар добавлен",
-                "item": response_item,
-                "timestamp": datetime.now().isoformat(),
+                "item": new_item,
+                "timestamp": datetime.now(),
             }
-        finally:
-            conn.close()
+        )
 
     except HTTPException:
         raise
@@ -329,59 +598,100 @@ async def add_item(item_data: ItemCreate):
             detail={
                 "error": "Database error",
                 "message": str(e),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": datetime.now(),
+            },
+        )
+
+
+@app.post(f"/{RESOURCE}/items/bulk-add")
+async def bulk_add_items(items_data: List[ItemCreate], request: Request):
+    """Создать несколько товаров одним запросом (не более MAX_BULK_ITEMS)."""
+    try:
+        if len(items_data) > MAX_BULK_ITEMS:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "error": "Validation error",
+                    "message": f"Не более {MAX_BULK_ITEMS} товаров за запрос",
+                },
+            )
+
+        names = [item.name.strip() for item in items_data]
+
+        if not names or not all(names):
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "error": "Validation error",
+                    "message": "Нужен непустой список товаров с названиями",
+                },
+            )
+
+        # Один INSERT на всю пачку; RETURNING сразу отдаёт созданные строки.
+        async with acquire_connection(request) as conn:
+            new_items = await conn.fetch(
+                "INSERT INTO fridge_items (name, is_in_fridge) "
+                "SELECT * FROM unnest($1::text[], $2::boolean[]) "
+                f"RETURNING {ITEM_COLUMNS}",
+                names,
+                [item.isInFridge for item in items_data],
+            )
+
+        invalidate_cache()
+        logger.debug("Добавлено товаров: %d", len(new_items))
+
+        return RecordJSONResponse(
+            {
+                "message": "Товары добавлены",
+                "count": len(new_items),
+                "items": new_items,
+                "timestamp": datetime.now(),
+            }
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Ошибка при добавлении товаров: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "Database error",
+                "message": str(e),
+                "timestamp": datetime.now(),
             },
         )
 
 
 @app.patch(f"/{RESOURCE}/items/move/{{item_id}}/toggle")
-async def toggle_item_position(item_id: int):
+async def toggle_item_position(item_id: int, request: Request):
     """Инвертировать флаг is_in_fridge."""
     try:
-        conn = get_db_connection()
-
-        try:
-            with closing(conn.cursor(cursor_factory=RealDictCursor)) as cursor:
-                cursor.execute("SELECT * FROM fridge_items WHERE id = %s", (item_id,))
-                current_item = cursor.fetchone()
-
-                if not current_item:
-                    raise HTTPException(
-                        status_code=404,
-                        detail={
-                            "error": "Not found",
-                            "message": f"Товар с ID {item_id} не найден",
-                        },
-                    )
+        async with acquire_connection(request) as conn:
+            updated_item = await conn.fetchrow(
+                "UPDATE fridge_items SET is_in_fridge = NOT is_in_fridge "
+                f"WHERE id = $1 RETURNING {ITEM_COLUMNS}",
+                item_id,
+            )
 
-                new_state = not current_item["is_in_fridge"]
-                cursor.execute(
-                    "UPDATE fridge_items SET is_in_fridge = %s "
-                    "WHERE id = %s RETURNING *",
-                    (new_state, item_id),
-                )
-                updated_item = cursor.fetchone()
-                conn.commit()
-
-            if not updated_item:
-                raise HTTPException(
-                    status_code=500,
-                    detail={
-                        "error": "Database error",
-                        "message": "Не удалось обновить запись",
-                    },
-                )
+        if not updated_item:
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    "error": "Not found",
+                    "message": f"Товар с ID {item_id} не найден",
+                },
+            )
 
-            response_item = dict(updated_item)
-            response_item["category"] = categorize_product(updated_item["name"])
+        invalidate_cache()
 
-            return {
+        return RecordJSONResponse(
+            {
                 "message": "Состояние товара обновлено",
-                "item": response_item,
-                "timestamp": datetime.now().isoformat(),
+                "item": updated_item,
+                "timestamp": datetime.now(),
             }
-        finally:
-            conn.close()
+        )
 
     except HTTPException:
         raise
@@ -392,58 +702,40 @@ async def toggle_item_position(item_id: int):
             detail={
                 "error": "Database error",
                 "message": str(e),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": datetime.now(),
             },
         )
 
 
 @app.delete(f"/{RESOURCE}/items/remove/{{item_id}}")
-async def delete_item(item_id: int):
+async def delete_item(item_id: int, request: Request):
     """Удалить товар по ID."""
     try:
-        conn = get_db_connection()
-
-        try:
-            with closing(conn.cursor(cursor_factory=RealDictCursor)) as cursor:
-                cursor.execute("SELECT * FROM fridge_items WHERE id = %s", (item_id,))
-                item = cursor.fetchone()
-
-                if not item:
-                    raise HTTPException(
-                        status_code=404,
-                        detail={
-                            "error": "Not found",
-                            "message": f"Товар с ID {item_id} не найден",
-                        },
-                    )
-
-                cursor.execute(
-                    "DELETE FROM fridge_items WHERE id = %s RETURNING *", (item_id,)
-                )
-                deleted_item = cursor.fetchone()
-                conn.commit()
-
-            if not deleted_item:
-                raise HTTPException(
-                    status_code=500,
-                    detail={
-                        "error": "Database error",
-                        "message": "Не удалось удалить запись",
-                    },
-                )
+        async with acquire_connection(request) as conn:
+            deleted_item = await conn.fetchrow(
+                f"DELETE FROM fridge_items WHERE id = $1 RETURNING {ITEM_COLUMNS}",
+                item_id,
+            )
 
-            response_item = dict(deleted_item)
-            response_item["category"] = categorize_product(deleted_item["name"])
+        if not deleted_item:
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    "error": "Not found",
+                    "message": f"Товар с ID {item_id} не найден",
+                },
+            )
 
-            print(f"Удалён товар: {item['name']} (ID: {item_id})")
+        invalidate_cache()
+        logger.debug("Удалён товар: %s (ID: %s)", deleted_item["name"], item_id)
 
-            return {
+        return RecordJSONResponse(
+            {
                 "message": "Товар удалён",
-                "deleted_item": response_item,
-                "timestamp": datetime.now().isoformat(),
+                "deleted_item": deleted_item,
+                "timestamp": datetime.now(),
             }
-        finally:
-            conn.close()
+        )
 
     except HTTPException:
         raise
@@ -454,40 +746,62 @@ async def delete_item(item_id: int):
             detail={
                 "error": "Database error",
                 "message": str(e),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": datetime.now(),
             },
         )
 
 
 @app.get(f"/{RESOURCE}/filter-by-category/{{category}}")
-async def filter_by_category(category: str):
+async def filter_by_category(category: str, request: Request):
     """Фильтрация списка по категории."""
     try:
-        conn = get_db_connection()
-
-        with closing(conn.cursor(cursor_factory=RealDictCursor)) as cursor:
-            cursor.execute("SELECT * FROM fridge_items ORDER BY created_at DESC")
-            all_items = cursor.fetchall() or []
-
-        conn.close()
-
-        filtered_items = []
-        for item in all_items:
-            if item and "name" in item:
-                item_category = categorize_product(item["name"])
-                if category.lower() in item_category.lower():
-                    processed = dict(item)
-                    processed["category"] = item_category
-                    filtered_items.append(processed)
+        # Категории, в названии которых встречается запрос (как и раньше).
+        matched_categories = [
+            cat
+            for cat in [*PRODUCT_CATEGORIES, "другое"]
+            if category.lower() in cat
+        ]
+
+        if not matched_categories:
+            items = []
+        else:
+            async with acquire_connection(request) as conn:
+                # Кандидатов дают совпадения с ключевыми словами категорий (через
+                # триграммный индекс); categorize() проверяется только на них,
+                # ведь слово из более ранней категории может перебить это.
+                items = await conn.fetch(
+                    f"""
+                    WITH matched AS (
+                        SELECT f.id
+                        FROM product_keywords pk
+                        JOIN fridge_items f
+                            ON lower(f.name) LIKE '%' || pk.keyword || '%'
+                        WHERE pk.category = ANY($1::text[])
+                        UNION
+                        -- «другое» — отсутствие совпадений, индексом его не
+                        -- найти; ветка работает, только если категория запрошена.
+                        SELECT id FROM fridge_items
+                        WHERE 'другое' = ANY($1::text[])
+                            AND categorize(name) = 'другое'
+                    )
+                    SELECT {ITEM_COLUMNS} FROM fridge_items
+                    WHERE id IN (SELECT id FROM matched)
+                        AND categorize(name) = ANY($1::text[])
+                    ORDER BY created_at DESC
+                """,
+                    matched_categories,
+                )
 
-        print(f"Найдено {len(filtered_items)} товаров в категории '{category}'")
+        logger.debug("Найдено %d товаров в категории '%s'", len(items), category)
 
-        return {
-            "category": category,
-            "count": len(filtered_items),
-            "items": filtered_items,
-            "timestamp": datetime.now().isoformat(),
-        }
+        return RecordJSONResponse(
+            {
+                "category": category,
+                "count": len(items),
+                "items": items,
+                "timestamp": datetime.now(),
+            }
+        )
 
     except Exception as e:
         print(f"Ошибка при фильтрации по категории: {e}")
@@ -496,76 +810,95 @@ async def filter_by_category(category: str):
             detail={
                 "error": "Database error",
                 "message": str(e),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": datetime.now(),
             },
         )
 
 
 @app.get(f"/{RESOURCE}/categories")
-async def get_categories():
+async def get_categories(request: Request):
     """Список категорий и несколько примеров по каждой."""
-    category_examples = {
-        cat: PRODUCT_CATEGORIES[cat][:3] for cat in PRODUCT_CATEGORIES
-    }
+    headers = {"ETag": CATEGORIES_ETAG, "Cache-Control": "no-cache"}
 
-    return {
-        "categories": list(PRODUCT_CATEGORIES.keys()),
-        "total_categories": len(PRODUCT_CATEGORIES),
-        "timestamp": datetime.now().isoformat(),
-        "category_examples": category_examples,
-    }
+    if etag_matches(request, CATEGORIES_ETAG):
+        return Response(status_code=304, headers=headers)
+    return RecordJSONResponse(
+        {**CATEGORIES_PAYLOAD, "timestamp": datetime.now()}, headers=headers
+    )
 
 
 @app.post(f"/{RESOURCE}/search-products")
-async def search_products(search_data: SearchRequest):
+async def search_products(search_data: SearchRequest, request: Request):
     """Поиск по названию или категории."""
     search_query = search_data.query.lower().strip()
 
     if not search_query:
-        return {
-            "error": "Validation error",
-            "message": "Пустой поисковый запрос",
-            "search_query": "",
-            "found_count": 0,
-            "items": [],
-        }
+        return RecordJSONResponse(
+            {
+                "error": "Validation error",
+                "message": "Пустой поисковый запрос",
+                "search_query": "",
+                "found_count": 0,
+                "items": [],
+            }
+        )
+
+    # Экранируем спецсимволы LIKE: ищем запрос как обычную подстроку.
+    name_pattern = "%{}%".format(
+        search_query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    )
 
     try:
-        conn = get_db_connection()
-
-        with closing(conn.cursor(cursor_factory=RealDictCursor)) as cursor:
-            cursor.execute("SELECT * FROM fridge_items ORDER BY created_at DESC")
-            all_items = cursor.fetchall() or []
-
-        conn.close()
-
-        found_items = []
-        for item in all_items:
-            if item and "name" in item:
-                item_category = categorize_product(item["name"])
-                item_name_lower = item["name"].lower()
-                category_keywords = PRODUCT_CATEGORIES.get(search_query, [])
-
-                if (
-                    search_query in item_category
-                    or search_query in item_name_lower
-                    or any(keyword in item_name_lower for keyword in category_keywords)
-                ):
-                    processed = dict(item)
-                    processed["category"] = item_category
-                    processed["match_type"] = (
-                        "category" if search_query in item_category else "name"
-                    )
-                    found_items.append(processed)
+        async with acquire_connection(request) as conn:
+            # Ветки UNION, а не OR: так совпадения по названию и по ключевым
+            # словам категории могут идти через триграммный индекс.
+            items = await conn.fetch(
+                f"""
+                WITH matched AS (
+                    SELECT id FROM fridge_items WHERE lower(name) LIKE $2
+                    UNION
+                    SELECT f.id
+                    FROM product_keywords pk
+                    JOIN fridge_items f
+                        ON lower(f.name) LIKE '%' || pk.keyword || '%'
+                    WHERE position($1 IN pk.category) > 0
+                        AND (
+                            pk.category = $1
+                            OR position($1 IN categorize(f.name)) > 0
+                        )
+                    UNION
+                    -- У «другое» нет ключевых слов; ветка отсекается сразу,
+                    -- если запрос не входит в название этой категории.
+                    SELECT id FROM fridge_items
+                    WHERE position($1 IN 'другое') > 0
+                        AND categorize(name) = 'другое'
+                )
+                SELECT *,
+                    CASE WHEN position($1 IN category) > 0
+                        THEN 'category' ELSE 'name'
+                    END AS match_type
+                FROM (
+                    SELECT {ITEM_COLUMNS} FROM fridge_items
+                    WHERE id IN (SELECT id FROM matched)
+                ) AS items
+                ORDER BY created_at DESC
+            """,
+                search_query,
+                name_pattern,
+            )
 
-        print(f"По запросу '{search_query}' найдено {len(found_items)} товаров")
+        logger.debug(
+            "По запросу '%s' найдено %d товаров", search_query, len(items)
+        )
 
-        return {
-            "search_query": search_query,
-            "found_count": len(found_items),
-            "items": found_items,
-            "timestamp": datetime.now().isoformat(),
-        }
+        return RecordJSONResponse(
+            {
+                "search_query": search_query,
+                "found_count": len(items),
+                "items": items,
+                "timestamp": datetime.now(),
+            }
+        )
 
     except Exception as e:
         print(f"Ошибка при поиске: {e}")
@@ -574,61 +907,60 @@ async def search_products(search_data: SearchRequest):
             detail={
                 "error": "Database error",
                 "message": str(e),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": datetime.now(),
             },
         )
 
 
 @app.get(f"/{RESOURCE}/statistics")
-async def get_statistics():
+async def get_statistics(request: Request):
     """Статистика по категориям."""
-    try:
-        conn = get_db_connection()
 
-        with closing(conn.cursor(cursor_factory=RealDictCursor)) as cursor:
-            cursor.execute("SELECT * FROM fridge_items")
-            all_items = cursor.fetchall() or []
-
-        conn.close()
+    async def load_statistics() -> Dict[str, Any]:
+        async with acquire_connection(request) as conn:
+            rows = await conn.fetch(
+                """
+                SELECT categorize(name) AS category,
+                    COUNT(*) FILTER (WHERE is_in_fridge) AS in_fridge,
+                    COUNT(*) FILTER (WHERE is_in_fridge IS NOT TRUE) AS out_of_fridge,
+                    COUNT(*) AS total
+                FROM fridge_items
+                GROUP BY 1
+            """
+            )
 
+        total_products = total_in_fridge = total_out_of_fridge = 0
         category_stats: Dict[str, Dict[str, Any]] = {}
-        for item in all_items:
-            if item and "name" in item and "is_in_fridge" in item:
-                category = categorize_product(item["name"])
-                stats = category_stats.setdefault(
-                    category,
-                    {"total": 0, "in_fridge": 0, "out_of_fridge": 0},
-                )
-                stats["total"] += 1
-                if item["is_in_fridge"]:
-                    stats["in_fridge"] += 1
-                else:
-                    stats["out_of_fridge"] += 1
-
-        for category, stats in category_stats.items():
-            if stats["total"] > 0:
-                stats["in_fridge_percentage"] = round(
-                    stats["in_fridge"] / stats["total"] * 100, 1
-                )
-                stats["out_of_fridge_percentage"] = round(
-                    stats["out_of_fridge"] / stats["total"] * 100, 1
-                )
-
-        total_in_fridge = sum(stats["in_fridge"] for stats in category_stats.values())
-        total_out_of_fridge = sum(
-            stats["out_of_fridge"] for stats in category_stats.values()
-        )
+        for row in rows:
+            total, in_fridge, out_of_fridge = (
+                row["total"],
+                row["in_fridge"],
+                row["out_of_fridge"],
+            )
+            category_stats[row["category"]] = {
+                "total": total,
+                "in_fridge": in_fridge,
+                "out_of_fridge": out_of_fridge,
+                "in_fridge_percentage": round(in_fridge / total * 100, 1),
+                "out_of_fridge_percentage": round(out_of_fridge / total * 100, 1),
+            }
+            total_products += total
+            total_in_fridge += in_fridge
+            total_out_of_fridge += out_of_fridge
 
         return {
-            "total_products": len(all_items),
+            "total_products": total_products,
             "categories": category_stats,
-            "timestamp": datetime.now().isoformat(),
             "summary": {
                 "total_in_fridge": total_in_fridge,
                 "total_out_of_fridge": total_out_of_fridge,
             },
         }
 
+    try:
+        statistics = await cached("statistics", load_statistics)
+        return RecordJSONResponse({**statistics, "timestamp": datetime.now()})
+
     except Exception as e:
         print(f"Ошибка при получении статистики: {e}")
         raise HTTPException(
@@ -636,55 +968,52 @@ async def get_statistics():
             detail={
                 "error": "Database error",
                 "message": str(e),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": datetime.now(),
             },
         )
 
 
 @app.get(f"/{RESOURCE}/test-connection")
-async def test_connection():
+async def test_connection(request: Request):
     """Проверка соединения с БД и базовых запросов."""
     try:
-        conn = get_db_connection()
-
-        with closing(conn.cursor()) as cursor:
-            cursor.execute("SELECT COUNT(*) FROM fridge_items")
-            total_result = cursor.fetchone()
-            total_items = total_result[0] if total_result else 0
+        async with acquire_connection(request) as conn:
+            total_items = await conn.fetchval("SELECT COUNT(*) FROM fridge_items") or 0
 
-            cursor.execute(
-                "SELECT COUNT(*) FROM fridge_items WHERE is_in_fridge = true"
+            in_fridge = (
+                await conn.fetchval(
+                    "SELECT COUNT(*) FROM fridge_items WHERE is_in_fridge = true"
+                )
+                or 0
             )
-            in_fridge_result = cursor.fetchone()
-            in_fridge = in_fridge_result[0] if in_fridge_result else 0
-
-            cursor.execute("SELECT version()")
-            version_result = cursor.fetchone()
-            db_version = version_result[0] if version_result else "unknown"
 
-        conn.close()
+            db_version = await conn.fetchval("SELECT version()") or "unknown"
 
-        return {
-            "status": "success",
-            "database": {
-                "version": db_version,
-                "connection": "established",
-                "total_items": total_items,
-                "items_in_fridge": in_fridge,
-                "items_out_of_fridge": total_items - in_fridge,
-            },
-            "timestamp": datetime.now().isoformat(),
-        }
+        return RecordJSONResponse(
+            {
+                "status": "success",
+                "database": {
+                    "version": db_version,
+                    "connection": "established",
+                    "total_items": total_items,
+                    "items_in_fridge": in_fridge,
+                    "items_out_of_fridge": total_items - in_fridge,
+                },
+                "timestamp": datetime.now(),
+            }
+        )
 
     except Exception as e:
-        return {
-            "status": "error",
-            "database": {
-                "connection": "failed",
-                "error": str(e),
-            },
-            "timestamp": datetime.now().isoformat(),
-        }
+        return RecordJSONResponse(
+            {
+                "status": "error",
+                "database": {
+                    "connection": "failed",
+                    "error": str(e),
+                },
+                "timestamp": datetime.now(),
+            }
+        )
 
 
 if __name__ == "__main__":
@@ -693,13 +1022,17 @@ if __name__ == "__main__":
     print(f"Время: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("Хост: 0.0.0.0")
     print("Порт: 8000")
+    print(f"Воркеры: {WEB_CONCURRENCY}")
 
 
     uvicorn.run(
-        app,
+        "main:app",
         host="0.0.0.0",
         port=8000,
-        log_level="info",
+        workers=WEB_CONCURRENCY,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
         reload=False,
-        access_log=True,
+        access_log=False,
     )